@@ -2,7 +2,8 @@
 
 Loads environment variables with validation and type checking.
 """
-import os
+import json
+from functools import cached_property, lru_cache
 from typing import List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator
@@ -20,10 +21,11 @@ class Settings(BaseSettings):
     # Security
     API_KEY_SECRET: str = Field(default="dev-secret-key-change-in-production", description="API secret key")
     
-    # CORS Configuration
-    CORS_ORIGINS: List[str] = Field(
+    # CORS Configuration (raw value, parsed on first access via CORS_ORIGINS)
+    CORS_ORIGINS_RAW: str | List[str] = Field(
         default=["http://localhost:3000", "http://localhost:19006"],
-        description="Allowed CORS origins"
+        alias="CORS_ORIGINS",
+        description="Allowed CORS origins (comma-separated or JSON list)"
     )
     
     # HuggingFace Settings
@@ -66,14 +68,6 @@ class Settings(BaseSettings):
             raise ValueError(f"LOG_LEVEL must be one of {allowed}")
         return v.upper()
     
-    @field_validator("CORS_ORIGINS", mode="before")
-    @classmethod
-    def parse_cors_origins(cls, v):
-        """Parse CORS origins from comma-separated string or list"""
-        if isinstance(v, str):
-            return [origin.strip() for origin in v.split(",")]
-        return v
-    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -81,12 +75,30 @@ class Settings(BaseSettings):
         extra="ignore",
     )
     
+    @cached_property
+    def CORS_ORIGINS(self) -> List[str]:
+        """Parse CORS origins from a list, comma-separated string or JSON list"""
+        if isinstance(self.CORS_ORIGINS_RAW, list):
+            return [origin.strip() for origin in self.CORS_ORIGINS_RAW]
+        raw = self.CORS_ORIGINS_RAW.strip()
+        if raw.startswith("["):
+            return [str(origin).strip() for origin in json.loads(raw)]
+        return [origin.strip() for origin in raw.split(",") if origin.strip()]
+    
+    @cached_property
+    def model_device(self) -> str:
+        """Device for ML model (cpu or cuda), resolved once
+        
+        torch is only imported when USE_GPU is enabled.
+        """
+        if not self.USE_GPU:
+            return "cpu"
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    
     def get_model_device(self) -> str:
         """Get device for ML model (cpu or cuda)"""
-        if self.USE_GPU:
-            import torch
-            return "cuda" if torch.cuda.is_available() else "cpu"
-        return "cpu"
+        return self.model_device
     
     def is_production(self) -> bool:
         """Check if running in production"""
@@ -97,8 +109,11 @@ class Settings(BaseSettings):
         return self.ENVIRONMENT == "development"
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Build settings once and reuse the cached instance"""
+    return Settings()
+
 
-# Create model cache directory if it doesn't exist
-os.makedirs(settings.MODEL_CACHE_DIR, exist_ok=True)
+# Global settings instance (kept for backwards compatibility)
+settings = get_settings()
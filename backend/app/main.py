@@ -2,20 +2,38 @@
 
 A privacy-first AI-powered sentiment analysis API for journal entries.
 """
-import os
+import asyncio
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Annotated
 
-from fastapi import FastAPI, HTTPException, status
+import msgspec
+import orjson
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel, Field
 
 from app.services.sentiment import SentimentAnalyzer
 from app.services.insights import InsightsGenerator
-from app.core.config import settings
+from app.core.config import get_settings
 from app.core.logging_config import setup_logging
 
+settings = get_settings()
+
+# Settings read on hot paths, bound once at import
+_ENV = settings.ENVIRONMENT
+_CORS = tuple(settings.CORS_ORIGINS)
+
+# Status codes used on request paths
+_HTTP_413 = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+_HTTP_500 = status.HTTP_500_INTERNAL_SERVER_ERROR
+_HTTP_503 = status.HTTP_503_SERVICE_UNAVAILABLE
+
 # Setup logging
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -24,6 +42,105 @@ logger = logging.getLogger(__name__)
 sentiment_analyzer: SentimentAnalyzer | None = None
 insights_generator: InsightsGenerator | None = None
 
+# Micro-batching of /analyze requests: up to this many texts per model call,
+# collected for at most this many seconds after the first one arrives
+_BATCH_MAX_SIZE = 16
+_BATCH_WINDOW = 0.005
+
+
+def _analyze_one(text: str) -> dict | Exception:
+    """Analyze a single text, returning the exception instead of raising it"""
+    try:
+        return sentiment_analyzer.analyze(text)
+    except Exception as e:
+        return e
+
+
+def _analyze_batch(texts: list[str]) -> list[dict | Exception]:
+    """Run the sentiment model over a batch of texts (blocking)
+    
+    Returns one outcome per text: its result, or the exception raised for
+    it, so one bad text only fails its own request. If analyze_batch
+    raises or returns the wrong number of results, the texts are retried
+    one at a time.
+    """
+    analyze_batch = getattr(sentiment_analyzer, "analyze_batch", None)
+    if analyze_batch is not None:
+        try:
+            results = list(analyze_batch(texts))
+            if len(results) != len(texts):
+                raise ValueError(f"analyze_batch returned {len(results)} results for {len(texts)} texts")
+            return results
+        except Exception as e:
+            logger.warning("Batch analysis failed, retrying texts individually: %s", e)
+    return [_analyze_one(text) for text in texts]
+
+
+async def _run_batch(batch: list[tuple[str, asyncio.Future]], pool: ThreadPoolExecutor):
+    """Analyze a batch on the thread pool and resolve each request's future"""
+    loop = asyncio.get_running_loop()
+    futures = [future for _, future in batch]
+    
+    try:
+        outcomes = await loop.run_in_executor(pool, _analyze_batch, [text for text, _ in batch])
+        pairs = list(zip(futures, outcomes, strict=True))
+    except Exception as e:
+        for future in futures:
+            if not future.done():
+                future.set_exception(e)
+        return
+    
+    for future, outcome in pairs:
+        if future.done():
+            continue
+        if isinstance(outcome, Exception):
+            future.set_exception(outcome)
+        else:
+            future.set_result(outcome)
+
+
+async def _batch_coalescer(queue: asyncio.Queue, pool: ThreadPoolExecutor, max_in_flight: int):
+    """Coalesce queued (text, future) pairs into batches for the thread pool
+    
+    At most `max_in_flight` batches run at once; while they are busy,
+    new requests accumulate in the queue and form the next, larger batch.
+    """
+    slots = asyncio.Semaphore(max_in_flight)
+    in_flight: set[asyncio.Task] = set()
+    
+    async def run(batch):
+        try:
+            await _run_batch(batch, pool)
+        finally:
+            slots.release()
+    
+    batch = []
+    try:
+        while True:
+            await slots.acquire()
+            batch = [await queue.get()]
+            if queue.qsize() < _BATCH_MAX_SIZE - 1:
+                await asyncio.sleep(_BATCH_WINDOW)
+            while len(batch) < _BATCH_MAX_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            task = asyncio.create_task(run(batch))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            batch = []
+    except asyncio.CancelledError:
+        # Fail requests that were not handed to the pool so they don't hang
+        pending = batch
+        while not queue.empty():
+            pending.append(queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Sentiment analyzer is shutting down"))
+        raise
+    finally:
+        # Let batches already handed to the pool finish on shutdown
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -32,19 +149,43 @@ async def lifespan(app: FastAPI):
     
     logger.info("Starting ReflectAI Backend...")
     
+    # Create model cache directory if it doesn't exist
+    Path(settings.MODEL_CACHE_DIR).mkdir(parents=True, exist_ok=True)
+    
     # Initialize ML models on startup
     try:
         sentiment_analyzer = SentimentAnalyzer()
         insights_generator = InsightsGenerator()
         logger.info("ML models loaded successfully")
     except Exception as e:
-        logger.error(f"Failed to load ML models: {e}")
+        logger.error("Failed to load ML models: %s", e)
         raise
     
+    # Warm up with a throwaway pass so the first request doesn't pay for it
+    try:
+        sentiment_analyzer.analyze("ok")
+        insights_generator.generate(["neutral"] * 3)
+    except Exception as e:
+        logger.warning("Model warmup failed: %s", e)
+    
+    # Model inference is blocking, so it runs off the event loop on a single
+    # thread: the model isn't safe to call concurrently, and torch already
+    # uses every core for one forward pass
+    app.state.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+    
+    # A single coalescer batches /analyze requests for the inference thread
+    app.state.analyze_queue = asyncio.Queue()
+    batch_task = asyncio.create_task(
+        _batch_coalescer(app.state.analyze_queue, app.state.pool, max_in_flight=1)
+    )
+    
     yield
     
     # Cleanup on shutdown
     logger.info("Shutting down ReflectAI Backend...")
+    batch_task.cancel()
+    await asyncio.gather(batch_task, return_exceptions=True)
+    app.state.pool.shutdown(wait=True)
 
 
 # Initialize FastAPI app
@@ -53,16 +194,17 @@ app = FastAPI(
     description="Privacy-first sentiment analysis and mood tracking API",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
 
-# CORS Configuration
+# CORS Configuration (the API only exposes GET and POST routes)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
+    allow_origins=_CORS,
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=("GET", "POST"),
     allow_headers=["*"],
 )
 
@@ -80,11 +222,26 @@ class JournalEntry(BaseModel):
         }
 
 
+class EmotionScores(BaseModel):
+    """Scores for each label of the emotion model"""
+    anger: float
+    disgust: float
+    fear: float
+    joy: float
+    neutral: float
+    sadness: float
+    surprise: float
+
+
 class SentimentResponse(BaseModel):
     """Sentiment analysis result"""
     mood: str = Field(..., description="Detected mood")
     confidence: float = Field(..., ge=0, le=1, description="Confidence score")
-    emotions: dict[str, float] | None = Field(None, description="Detailed emotion scores")
+    emotions: EmotionScores | None = Field(
+        None,
+        description="Detailed emotion scores; null when the analyzer's output doesn't "
+                    "cover exactly the emotion model's labels (e.g. the VADER fallback)"
+    )
 
 
 class InsightsRequest(BaseModel):
@@ -106,24 +263,207 @@ class InsightsResponse(BaseModel):
     dominant_emotion: str = Field(..., description="Most frequent emotion")
 
 
+# Request bodies are decoded with msgspec; the pydantic models above
+# mirror them and are kept for the OpenAPI schema
+class JournalEntryBody(msgspec.Struct):
+    """Decoded body of an analyze request"""
+    text: Annotated[str, msgspec.Meta(min_length=1, max_length=5000)]
+
+
+class InsightsRequestBody(msgspec.Struct):
+    """Decoded body of an insights request"""
+    moods: Annotated[list[str], msgspec.Meta(min_length=1)]
+
+
+# The analyze response is encoded with msgspec as well; SentimentResponse
+# and EmotionScores above document it
+class Emotions(msgspec.Struct, forbid_unknown_fields=True):
+    """Fixed-schema scores for the emotion model's labels"""
+    anger: float
+    disgust: float
+    fear: float
+    joy: float
+    neutral: float
+    sadness: float
+    surprise: float
+
+
+class SentimentResult(msgspec.Struct):
+    """Encoded body of an analyze response"""
+    mood: str
+    confidence: Annotated[float, msgspec.Meta(ge=0, le=1)]
+    emotions: Emotions | None = None
+
+
+_json_encoder = msgspec.json.Encoder()
+
+# Mismatched emotion scores are expected on every request while a fallback
+# analyzer is active, so only the first one is logged as a warning
+_emotions_mismatch_warned = False
+
+
+def to_sentiment_result(raw: dict) -> SentimentResult:
+    """Convert analyzer output to a SentimentResult
+    
+    Emotion scores that don't match the model's label set exactly (e.g.
+    from a fallback analyzer) are omitted rather than guessed at.
+    """
+    global _emotions_mismatch_warned
+    
+    emotions = raw.get("emotions")
+    if emotions is not None:
+        try:
+            emotions = msgspec.convert(emotions, Emotions)
+        except msgspec.ValidationError as e:
+            if _emotions_mismatch_warned:
+                logger.debug("Omitting emotion scores that don't match the model labels: %s", e)
+            else:
+                logger.warning("Omitting emotion scores that don't match the model labels: %s", e)
+                _emotions_mismatch_warned = True
+            emotions = None
+    
+    result = msgspec.convert({**raw, "emotions": None}, SentimentResult)
+    result.emotions = emotions
+    return result
+
+
+# Upper bound on the analyze request body: 5000 characters at up to 12 bytes
+# each (a non-BMP character escaped as a \uXXXX\uXXXX surrogate pair, as
+# json.dumps does by default) plus JSON framing
+_MAX_JOURNAL_BODY_BYTES = 64 * 1024
+
+
+# msgspec error messages mapped to the pydantic error types FastAPI reports,
+# so 422 responses keep the shape clients saw before msgspec decoding
+_ERROR_TYPES = (
+    (re.compile(r"^Object missing required field `(\w+)`"), "missing"),
+    (re.compile(r"^Expected `str` of length >= "), "string_too_short"),
+    (re.compile(r"^Expected `str` of length <= "), "string_too_long"),
+    (re.compile(r"^Expected `array` of length >= "), "too_short"),
+    (re.compile(r"^Expected `array` of length <= "), "too_long"),
+    (re.compile(r"^Expected `str`, got "), "string_type"),
+    (re.compile(r"^Expected `array`, got "), "list_type"),
+    (re.compile(r"^Expected `object`, got "), "model_attributes_type"),
+)
+_ERROR_PATH = re.compile(r"^(.*) - at `(\$[^`]*)`$")
+_PATH_PART = re.compile(r"\.(\w+)|\[(\d+)\]")
+
+
+class ValidationErrorDetail(BaseModel):
+    """A single request validation error"""
+    loc: list[str | int]
+    msg: str
+    type: str
+
+
+class HTTPValidationError(BaseModel):
+    """Body of a 422 response"""
+    detail: list[ValidationErrorDetail]
+
+
+_VALIDATION_RESPONSES = {422: {"model": HTTPValidationError, "description": "Validation Error"}}
+
+
+def validation_errors(error: msgspec.DecodeError, body: bytes) -> list[dict]:
+    """Convert a msgspec decode error into FastAPI-style validation errors"""
+    if not body:
+        return [{"loc": ("body",), "msg": "Field required", "type": "missing"}]
+    if not isinstance(error, msgspec.ValidationError):
+        return [{"loc": ("body",), "msg": str(error), "type": "json_invalid"}]
+    
+    msg, path = str(error), "$"
+    match = _ERROR_PATH.match(msg)
+    if match:
+        msg, path = match.groups()
+    loc = ["body"]
+    for key, index in _PATH_PART.findall(path):
+        loc.append(key if key else int(index))
+    
+    error_type = "value_error"
+    for pattern, candidate in _ERROR_TYPES:
+        type_match = pattern.match(msg)
+        if type_match:
+            error_type = candidate
+            if candidate == "missing":
+                loc.append(type_match.group(1))
+            break
+    return [{"loc": tuple(loc), "msg": msg, "type": error_type}]
+
+
+def msgspec_body(struct_type: type[msgspec.Struct], max_bytes: int | None = None):
+    """Build a dependency that decodes the JSON request body into `struct_type`
+    
+    If `max_bytes` is given, bodies larger than it are rejected with 413
+    while streaming, before the rest is read or anything is decoded.
+    """
+    decoder = msgspec.json.Decoder(struct_type)
+    
+    def too_large() -> HTTPException:
+        return HTTPException(
+            status_code=_HTTP_413,
+            detail="Request body too large"
+        )
+    
+    async def read_body(request: Request) -> bytes:
+        content_length = request.headers.get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+            raise too_large()
+        
+        chunks = []
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_bytes:
+                raise too_large()
+            chunks.append(chunk)
+        return b"".join(chunks)
+    
+    async def decode(request: Request):
+        if max_bytes is None:
+            body = await request.body()
+        else:
+            body = await read_body(request)
+        
+        try:
+            return decoder.decode(body)
+        except msgspec.DecodeError as e:
+            raise RequestValidationError(validation_errors(e, body))
+    
+    return decode
+
+
+def openapi_body(model: type[BaseModel]) -> dict:
+    """OpenAPI requestBody entry documenting `model` as the JSON body"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}},
+        }
+    }
+
+
+# Constant response bodies, encoded once at import
+_ROOT_BYTES = orjson.dumps({
+    "message": "Welcome to ReflectAI API",
+    "version": "1.0.0",
+    "docs": "/docs",
+    "health": "/health"
+})
+_HEALTH_BASE = {"status": "ok", "environment": _ENV}
+
+
 # API Endpoints
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint"""
-    return {
-        "message": "Welcome to ReflectAI API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "health": "/health"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
 @app.get("/health", tags=["Health"], response_model=dict)
 async def health_check():
     """Health check endpoint for monitoring"""
     return {
-        "status": "ok",
-        "environment": settings.ENVIRONMENT,
+        **_HEALTH_BASE,
         "model_loaded": sentiment_analyzer is not None,
         "insights_available": insights_generator is not None,
     }
@@ -134,8 +474,12 @@ async def health_check():
     response_model=SentimentResponse,
     status_code=status.HTTP_200_OK,
     tags=["Sentiment Analysis"],
+    responses=_VALIDATION_RESPONSES,
+    openapi_extra=openapi_body(JournalEntry),
 )
-async def analyze_sentiment(entry: JournalEntry):
+async def analyze_sentiment(
+    entry: JournalEntryBody = Depends(msgspec_body(JournalEntryBody, max_bytes=_MAX_JOURNAL_BODY_BYTES)),
+):
     """
     Analyze sentiment of a journal entry.
     
@@ -144,20 +488,22 @@ async def analyze_sentiment(entry: JournalEntry):
     if not sentiment_analyzer:
         logger.error("Sentiment analyzer not initialized")
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            status_code=_HTTP_503,
             detail="Sentiment analysis service unavailable"
         )
     
     try:
         # Analyze the journal text
-        result = sentiment_analyzer.analyze(entry.text)
-        logger.info(f"Sentiment analyzed: {result['mood']} (confidence: {result['confidence']:.2f})")
-        return result
+        future = asyncio.get_running_loop().create_future()
+        app.state.analyze_queue.put_nowait((entry.text, future))
+        result = to_sentiment_result(await future)
+        logger.info("Sentiment analyzed: %s (confidence: %.2f)", result.mood, result.confidence)
+        return Response(content=_json_encoder.encode(result), media_type="application/json")
     
     except Exception as e:
-        logger.error(f"Error analyzing sentiment: {e}")
+        logger.error("Error analyzing sentiment: %s", e)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=_HTTP_500,
             detail="Failed to analyze sentiment"
         )
 
@@ -167,8 +513,10 @@ async def analyze_sentiment(entry: JournalEntry):
     response_model=InsightsResponse,
     status_code=status.HTTP_200_OK,
     tags=["Insights"],
+    responses=_VALIDATION_RESPONSES,
+    openapi_extra=openapi_body(InsightsRequest),
 )
-async def generate_insights(request: InsightsRequest):
+async def generate_insights(request: InsightsRequestBody = Depends(msgspec_body(InsightsRequestBody))):
     """
     Generate personalized insights based on mood history.
     
@@ -177,41 +525,63 @@ async def generate_insights(request: InsightsRequest):
     if not insights_generator:
         logger.error("Insights generator not initialized")
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            status_code=_HTTP_503,
             detail="Insights generation service unavailable"
         )
     
     try:
         insights = insights_generator.generate(request.moods)
-        logger.info(f"Insights generated for {len(request.moods)} mood entries")
+        logger.info("Insights generated for %d mood entries", len(request.moods))
         return insights
     
     except Exception as e:
-        logger.error(f"Error generating insights: {e}")
+        logger.error("Error generating insights: %s", e)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=_HTTP_500,
             detail="Failed to generate insights"
         )
 
 
+# Encoded error bodies keyed by (status_code, detail); the set of raised
+# errors is small, but the cap guards against unbounded growth
+_ERROR_BODY_CACHE: dict[tuple[int, str], bytes] = {}
+_ERROR_BODY_CACHE_MAX = 256
+
+
 # Exception handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Custom HTTP exception handler"""
-    logger.warning(f"HTTP {exc.status_code}: {exc.detail}")
-    return JSONResponse(
+    logger.warning("HTTP %d: %s", exc.status_code, exc.detail)
+    
+    if not isinstance(exc.detail, str):
+        return ORJSONResponse(
+            status_code=exc.status_code,
+            content={"error": exc.detail, "status_code": exc.status_code},
+            headers=exc.headers,
+        )
+    
+    key = (exc.status_code, exc.detail)
+    body = _ERROR_BODY_CACHE.get(key)
+    if body is None:
+        body = orjson.dumps({"error": exc.detail, "status_code": exc.status_code})
+        if len(_ERROR_BODY_CACHE) < _ERROR_BODY_CACHE_MAX:
+            _ERROR_BODY_CACHE[key] = body
+    return Response(
+        content=body,
         status_code=exc.status_code,
-        content={"error": exc.detail, "status_code": exc.status_code}
+        headers=exc.headers,
+        media_type="application/json",
     )
 
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """General exception handler"""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content={"error": "Internal server error", "status_code": 500}
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
+    return ORJSONResponse(
+        status_code=_HTTP_500,
+        content={"error": "Internal server error", "status_code": _HTTP_500}
     )
 
 
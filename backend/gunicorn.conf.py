@@ -0,0 +1,14 @@
+"""Gunicorn Configuration for ReflectAI Backend
+
+Run with: gunicorn -c gunicorn.conf.py app.main:app
+
+The app is imported once in the master process and workers are forked
+from it, so settings are parsed and validated once rather than per worker.
+ML models are still loaded per worker in the app lifespan.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True